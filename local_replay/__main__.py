@@ -0,0 +1,246 @@
+import argparse
+import cProfile
+import importlib
+import logging
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from unittest import mock
+
+from local_replay.local_aws import LocalS3Client, LocalSQSClient, local_client_factory
+from local_replay.recording import (
+    IncompleteRecordingError,
+    RecordingNotFoundError,
+    ResponseRecorder,
+    ResponseReplayer,
+)
+
+logger = logging.getLogger()
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+LAMBDA_MODULES = ("lambda_function", "helpers", "generate_signed_urls")
+HANDLERS = {
+    "one": (REPO_ROOT / "lambda_one", "lambda_one_handler"),
+    "two": (REPO_ROOT / "lambda_two", "lambda_two_handler"),
+}
+LOCAL_BUCKET = "local-data-quest"
+LOCAL_QUEUE_URL = "local://sqs/data-quest"
+
+
+class ReplayFailedError(RuntimeError):
+    """Raised when a replayed handler logs errors or requests an unrecorded URL."""
+
+
+class ErrorCounter(logging.Handler):
+    """Counts the ERROR log records emitted while it is attached."""
+
+    def __init__(self):
+        super().__init__(level=logging.ERROR)
+        self.count = 0
+
+    def emit(self, record):
+        self.count += 1
+
+
+def load_handler(name: str):
+    """Imports a lambda handler from its directory, as the Lambda runtime would.
+
+    Both lambda directories use the same flat module names (lambda_function,
+    helpers), so any previously imported copies are dropped first.
+
+    Args:
+        name (str): Handler to load, "one" or "two".
+
+    Returns:
+        function: The lambda handler function.
+    """
+    lambda_dir, handler_name = HANDLERS[name]
+    for module in LAMBDA_MODULES:
+        sys.modules.pop(module, None)
+    sys.path.insert(0, str(lambda_dir))
+    try:
+        module = importlib.import_module("lambda_function")
+    finally:
+        sys.path.remove(str(lambda_dir))
+    return getattr(module, handler_name)
+
+
+@contextmanager
+def offline_environment(s3_client: LocalS3Client, sqs_client: LocalSQSClient, get):
+    """Routes boto3 clients to the local stand-ins and requests.get to the given function."""
+    env = {"BUCKET_NAME": LOCAL_BUCKET, "SQS_QUEUE_URL": LOCAL_QUEUE_URL}
+    with mock.patch.dict(os.environ, env), mock.patch(
+        "boto3.client", local_client_factory(s3_client, sqs_client)
+    ), mock.patch("requests.get", get):
+        yield
+
+
+def build_event(name: str, sqs_client: LocalSQSClient) -> dict:
+    if name == "one":
+        return {"source": "aws.events", "detail-type": "Scheduled Event"}
+    records = sqs_client.messages or [
+        {"messageId": "local", "body": "Data USA population data uploaded"}
+    ]
+    return {"Records": records}
+
+
+def invoke(name: str, sqs_client: LocalSQSClient, profile_dir: Path | None):
+    """Runs a lambda handler once, timing it and optionally profiling it.
+
+    The handlers log and swallow their own exceptions, so the ERROR records
+    they emit are counted to tell whether the run actually succeeded.
+
+    Args:
+        name (str): Handler to run, "one" or "two".
+        sqs_client (LocalSQSClient): Local queue used to build lambda_two's event.
+        profile_dir (Path | None): Directory to write cProfile stats to, if any.
+
+    Returns:
+        tuple: Elapsed seconds and the number of ERROR records logged.
+    """
+    handler = load_handler(name)
+    event = build_event(name, sqs_client)
+    profiler = cProfile.Profile() if profile_dir else None
+    error_counter = ErrorCounter()
+    logging.getLogger().addHandler(error_counter)
+    start = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    try:
+        handler(event, None)
+    finally:
+        if profiler:
+            profiler.disable()
+        elapsed = time.perf_counter() - start
+        logging.getLogger().removeHandler(error_counter)
+    logger.info(f"lambda_{name}_handler finished in {elapsed:.3f}s")
+    if profiler:
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        profile_path = profile_dir / f"lambda_{name}.prof"
+        profiler.dump_stats(profile_path)
+        logger.info(f"Profile for lambda_{name}_handler written to {profile_path}")
+    return elapsed, error_counter.count
+
+
+def check_replay(name: str, error_count: int, replayer: ResponseReplayer) -> None:
+    """Fails the run if a replayed handler logged errors or went off the recording.
+
+    Raises:
+        ReplayFailedError: If any ERROR records were logged or unrecorded URLs requested.
+    """
+    problems = []
+    if replayer.missed_urls:
+        problems.append(f"requested unrecorded URLs {replayer.missed_urls}")
+    if error_count:
+        problems.append(f"logged {error_count} error(s)")
+    if problems:
+        raise ReplayFailedError(f"lambda_{name}_handler {' and '.join(problems)}")
+
+
+def record(args, bucket_dir: Path):
+    recorder = ResponseRecorder(args.cassette)
+    s3_client = LocalS3Client(bucket_dir)
+    sqs_client = LocalSQSClient()
+    with offline_environment(s3_client, sqs_client, recorder.get):
+        invoke("one", sqs_client, profile_dir=None)
+    manifest_path = recorder.save()
+    logger.info(f"Recorded {len(recorder.manifest)} responses to {manifest_path}")
+
+
+def run(args, bucket_dir: Path):
+    replayer = ResponseReplayer(args.cassette, scale=args.scale)
+    s3_client = LocalS3Client(bucket_dir)
+    sqs_client = LocalSQSClient()
+    handlers = ["one", "two"] if args.handler == "both" else [args.handler]
+    with offline_environment(s3_client, sqs_client, replayer.get):
+        if args.handler == "two":
+            logger.info(
+                f"Seeding the local bucket for lambda_two by replaying lambda_one "
+                f"at scale {args.scale}"
+            )
+            _, error_count = invoke("one", sqs_client, profile_dir=None)
+            check_replay("one", error_count, replayer)
+        timings = {}
+        for name in handlers:
+            elapsed, error_count = invoke(
+                name, sqs_client, profile_dir=args.profile_dir
+            )
+            check_replay(name, error_count, replayer)
+            timings[name] = elapsed
+    for name, elapsed in timings.items():
+        print(f"lambda_{name}_handler (scale={args.scale}): {elapsed:.3f}s")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m local_replay",
+        description="Record upstream responses and replay the lambda handlers offline.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = subparsers.add_parser(
+        "record",
+        help="Run lambda_one against bls.gov and DataUSA, saving every response.",
+    )
+    record_parser.set_defaults(func=record)
+
+    run_parser = subparsers.add_parser(
+        "run", help="Run a handler end to end against a recording."
+    )
+    run_parser.add_argument("--handler", choices=["one", "two", "both"], default="both")
+    run_parser.add_argument(
+        "--scale",
+        type=int,
+        default=1,
+        help="Number of times the data rows of every BLS file are repeated. "
+        "The DataUSA response is replayed unchanged.",
+    )
+    run_parser.add_argument(
+        "--profile-dir",
+        type=Path,
+        help="Write cProfile stats for each handler to this directory.",
+    )
+    run_parser.add_argument(
+        "--bucket-dir",
+        type=Path,
+        help="Directory backing the local S3 bucket. A fresh temporary "
+        "directory is used when omitted.",
+    )
+    run_parser.set_defaults(func=run)
+
+    for subparser in (record_parser, run_parser):
+        subparser.add_argument(
+            "--cassette",
+            type=Path,
+            default=REPO_ROOT / ".local_replay" / "cassette",
+            help="Directory holding the recorded responses.",
+        )
+
+    args = parser.parse_args(argv)
+    if args.command == "run" and args.scale < 1:
+        parser.error("--scale must be a positive integer")
+    return args
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    args = parse_args(argv)
+    try:
+        if getattr(args, "bucket_dir", None):
+            args.func(args, args.bucket_dir)
+            return
+        with tempfile.TemporaryDirectory(prefix="local_s3_") as bucket_dir:
+            args.func(args, Path(bucket_dir))
+    except RecordingNotFoundError as e:
+        logger.error(f"{e} - run `python -m local_replay record` first")
+        sys.exit(1)
+    except (IncompleteRecordingError, ReplayFailedError) as e:
+        logger.error(str(e))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
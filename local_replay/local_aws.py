@@ -0,0 +1,175 @@
+import io
+import json
+import logging
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger()
+
+
+class LocalS3Client:
+    """Directory-backed stand-in for the subset of the boto3 S3 client used by the lambdas.
+
+    Objects are stored at ``<root>/<bucket>/<key>`` and their user metadata at
+    ``<root>/.metadata/<bucket>/<key>.json``.
+
+    Args:
+        root (Path): Directory holding the local buckets.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def _object_path(self, bucket: str, key: str) -> Path:
+        return self.root / bucket / key
+
+    def _metadata_path(self, bucket: str, key: str) -> Path:
+        return self.root / ".metadata" / bucket / f"{key}.json"
+
+    def _no_such_key(self, operation: str, key: str) -> ClientError:
+        return ClientError(
+            {"Error": {"Code": "NoSuchKey", "Message": f"{key} does not exist"}},
+            operation,
+        )
+
+    def put_object(
+        self, Bucket: str, Key: str, Body, Metadata=None, ContentType=None, **kwargs
+    ) -> dict:
+        if isinstance(Body, str):
+            Body = Body.encode("utf-8")
+        object_path = self._object_path(Bucket, Key)
+        object_path.parent.mkdir(parents=True, exist_ok=True)
+        object_path.write_bytes(Body)
+        metadata_path = self._metadata_path(Bucket, Key)
+        metadata_path.parent.mkdir(parents=True, exist_ok=True)
+        metadata_path.write_text(
+            json.dumps({"Metadata": Metadata or {}, "ContentType": ContentType})
+        )
+        return {}
+
+    def head_object(self, Bucket: str, Key: str, **kwargs) -> dict:
+        object_path = self._object_path(Bucket, Key)
+        if not object_path.is_file():
+            raise self._no_such_key("HeadObject", Key)
+        metadata_path = self._metadata_path(Bucket, Key)
+        stored = {}
+        if metadata_path.is_file():
+            stored = json.loads(metadata_path.read_text())
+        stat = object_path.stat()
+        return {
+            "ContentLength": stat.st_size,
+            "ContentType": stored.get("ContentType") or "binary/octet-stream",
+            "LastModified": datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
+            "Metadata": stored.get("Metadata", {}),
+        }
+
+    def get_object(self, Bucket: str, Key: str, **kwargs) -> dict:
+        object_path = self._object_path(Bucket, Key)
+        if not object_path.is_file():
+            raise self._no_such_key("GetObject", Key)
+        response = self.head_object(Bucket=Bucket, Key=Key)
+        response["Body"] = io.BytesIO(object_path.read_bytes())
+        return response
+
+    def delete_object(self, Bucket: str, Key: str, **kwargs) -> dict:
+        self._object_path(Bucket, Key).unlink(missing_ok=True)
+        self._metadata_path(Bucket, Key).unlink(missing_ok=True)
+        return {}
+
+    def _list_keys(self, bucket: str, prefix: str = "") -> list[dict]:
+        """Lists the objects in a local bucket in S3 (lexicographic) key order.
+
+        Args:
+            bucket (str): Name of the local bucket.
+            prefix (str): Only return keys starting with this prefix.
+
+        Returns:
+            list: List of dictionaries with Key, LastModified, and Size.
+        """
+        bucket_path = self.root / bucket
+        if not bucket_path.is_dir():
+            return []
+        contents = []
+        for path in bucket_path.rglob("*"):
+            if not path.is_file():
+                continue
+            key = path.relative_to(bucket_path).as_posix()
+            if not key.startswith(prefix):
+                continue
+            stat = path.stat()
+            contents.append(
+                {
+                    "Key": key,
+                    "LastModified": datetime.fromtimestamp(
+                        stat.st_mtime, tz=timezone.utc
+                    ),
+                    "Size": stat.st_size,
+                }
+            )
+        return sorted(contents, key=lambda obj: obj["Key"])
+
+    def get_paginator(self, operation_name: str):
+        if operation_name != "list_objects_v2":
+            raise NotImplementedError(f"No local paginator for {operation_name}")
+        return LocalListObjectsV2Paginator(self)
+
+    def generate_presigned_url(self, ClientMethod: str, Params: dict, **kwargs) -> str:
+        object_path = self._object_path(Params["Bucket"], Params["Key"])
+        return object_path.resolve().as_uri()
+
+
+class LocalListObjectsV2Paginator:
+    """Mimics the boto3 list_objects_v2 paginator over a LocalS3Client."""
+
+    def __init__(self, client: LocalS3Client, page_size: int = 1000):
+        self.client = client
+        self.page_size = page_size
+
+    def paginate(self, Bucket: str, Prefix: str = "", **kwargs):
+        contents = self.client._list_keys(Bucket, Prefix)
+        if not contents:
+            yield {"KeyCount": 0}
+            return
+        for start in range(0, len(contents), self.page_size):
+            page = contents[start : start + self.page_size]
+            yield {"Contents": page, "KeyCount": len(page)}
+
+
+class LocalSQSClient:
+    """In-memory stand-in for the boto3 SQS client; keeps every message sent."""
+
+    def __init__(self):
+        self.messages = []
+
+    def send_message(self, QueueUrl: str, MessageBody: str, **kwargs) -> dict:
+        message_id = str(uuid.uuid4())
+        self.messages.append(
+            {"messageId": message_id, "eventSourceARN": QueueUrl, "body": MessageBody}
+        )
+        logger.info(f"Local SQS message queued for {QueueUrl}: {MessageBody}")
+        return {"MessageId": message_id}
+
+
+def local_client_factory(s3_client: LocalS3Client, sqs_client: LocalSQSClient):
+    """Builds a replacement for boto3.client that returns the local stand-ins.
+
+    Args:
+        s3_client (LocalS3Client): Client returned for the "s3" service.
+        sqs_client (LocalSQSClient): Client returned for the "sqs" service.
+
+    Returns:
+        function: Callable with the same signature as boto3.client.
+    """
+    clients = {"s3": s3_client, "sqs": sqs_client}
+
+    def client(service_name, *args, **kwargs):
+        if service_name not in clients:
+            raise NotImplementedError(
+                f"No local stand-in for the {service_name} client"
+            )
+        return clients[service_name]
+
+    return client
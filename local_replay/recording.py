@@ -0,0 +1,259 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+from pathlib import Path
+from urllib.parse import urlparse
+
+import requests
+
+logger = logging.getLogger()
+
+MANIFEST_FILE = "manifest.json"
+BLS_HOST = "download.bls.gov"
+
+
+class RecordingNotFoundError(FileNotFoundError):
+    """Raised when a cassette directory has no manifest to replay."""
+
+
+class IncompleteRecordingError(ValueError):
+    """Raised when a recording is missing responses needed to replay the handlers."""
+
+
+def classify_url(url: str) -> str:
+    """Classifies a requested URL as the BLS listing, a BLS file, or an API response.
+
+    Args:
+        url (str): URL requested by a handler.
+
+    Returns:
+        str: One of "bls_listing", "bls_file", or "api".
+
+    Example:
+        >>> classify_url("https://download.bls.gov//pub/time.series/pr/")
+        'bls_listing'
+    """
+    parsed = urlparse(url)
+    if parsed.netloc != BLS_HOST:
+        return "api"
+    if parsed.path.endswith("/"):
+        return "bls_listing"
+    return "bls_file"
+
+
+def get_body_file_name(url: str) -> str:
+    """Builds a readable, collision-free file name for a recorded response body.
+
+    Args:
+        url (str): URL the body was retrieved from.
+
+    Returns:
+        str: File name for the body within the cassette.
+
+    Example:
+        >>> get_body_file_name("https://download.bls.gov/pub/time.series/pr/pr.class")
+        '5bf34a0a746b_pr.class'
+    """
+    digest = hashlib.md5(url.encode()).hexdigest()[:12]
+    name = urlparse(url).path.rstrip("/").rsplit("/", 1)[-1] or "index"
+    return f"{digest}_{name}"
+
+
+def validate_manifest(manifest: dict) -> None:
+    """Checks that a recording holds everything needed to replay both handlers.
+
+    Args:
+        manifest (dict): Mapping of URL to recorded response details.
+
+    Raises:
+        IncompleteRecordingError: If the BLS listing was not retrieved
+            successfully, or no BLS files or DataUSA response were recorded.
+    """
+    kinds = [entry["kind"] for entry in manifest.values()]
+    problems = []
+    if not any(
+        entry["kind"] == "bls_listing" and entry["status_code"] == 200
+        for entry in manifest.values()
+    ):
+        problems.append("no successful BLS listing")
+    if "bls_file" not in kinds:
+        problems.append("no BLS files")
+    if "api" not in kinds:
+        problems.append("no DataUSA response")
+    if problems:
+        raise IncompleteRecordingError(f"Incomplete recording: {', '.join(problems)}")
+
+
+class ResponseRecorder:
+    """Wraps requests.get, saving every response to a cassette directory.
+
+    Args:
+        cassette_dir (Path): Directory the responses and manifest are written to.
+        get (function): The real requests.get to delegate to.
+    """
+
+    def __init__(self, cassette_dir: Path, get=requests.get):
+        self.cassette_dir = Path(cassette_dir)
+        self._get = get
+        self.manifest = {}
+        self.bodies = {}
+
+    def get(self, url, *args, **kwargs):
+        response = self._get(url, *args, **kwargs)
+        body_file = get_body_file_name(url)
+        self.bodies[body_file] = response.content
+        self.manifest[url] = {
+            "kind": classify_url(url),
+            "status_code": response.status_code,
+            "encoding": response.encoding,
+            "content_type": response.headers.get("Content-Type"),
+            "body_file": body_file,
+        }
+        logger.info(
+            f"Recorded {url} ({response.status_code}, {len(response.content)} bytes)"
+        )
+        return response
+
+    def save(self) -> Path:
+        """Writes the recorded responses and their manifest, replacing any earlier recording.
+
+        Everything is written to a staging directory first, so an existing
+        recording is only replaced once the new one is known to be complete.
+
+        Returns:
+            Path: Location of the manifest file.
+
+        Raises:
+            IncompleteRecordingError: If the recording cannot replay both handlers.
+        """
+        validate_manifest(self.manifest)
+        self.cassette_dir.mkdir(parents=True, exist_ok=True)
+        staging_dir = Path(tempfile.mkdtemp(dir=self.cassette_dir.parent))
+        try:
+            (staging_dir / "responses").mkdir()
+            for body_file, body in self.bodies.items():
+                (staging_dir / "responses" / body_file).write_bytes(body)
+            (staging_dir / MANIFEST_FILE).write_text(
+                json.dumps(self.manifest, indent=2)
+            )
+            shutil.rmtree(self.cassette_dir / "responses", ignore_errors=True)
+            os.replace(staging_dir / "responses", self.cassette_dir / "responses")
+            os.replace(staging_dir / MANIFEST_FILE, self.cassette_dir / MANIFEST_FILE)
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+        return self.cassette_dir / MANIFEST_FILE
+
+
+def scale_tabular_body(body: bytes, scale: int) -> bytes:
+    """Repeats the data rows of a delimited text file, keeping a single header row.
+
+    Args:
+        body (bytes): Original file content.
+        scale (int): Number of times the data rows appear in the result.
+
+    Returns:
+        bytes: The scaled file content.
+
+    Example:
+        >>> scale_tabular_body(b"a\\tb\\n1\\t2\\n", 2)
+        b'a\\tb\\n1\\t2\\n1\\t2\\n'
+    """
+    if scale == 1:
+        return body
+    lines = body.splitlines(keepends=True)
+    if len(lines) < 2:
+        return body
+    rows = lines[1:]
+    if not rows[-1].endswith(b"\n"):
+        rows[-1] += b"\n"
+    return lines[0] + b"".join(rows * scale)
+
+
+def rewrite_listing_sizes(listing: str, sizes: dict[str, int]) -> str:
+    """Updates the file sizes in a BLS directory listing to match scaled bodies.
+
+    Args:
+        listing (str): HTML of the BLS directory listing.
+        sizes (dict): Mapping of link path (e.g. "/pub/time.series/pr/pr.class") to size in bytes.
+
+    Returns:
+        str: The listing with the size preceding each matching link replaced.
+
+    Example:
+        >>> rewrite_listing_sizes('5:11 PM 18343 <A HREF="/x">x</A>', {"/x": 99})
+        '5:11 PM 99 <A HREF="/x">x</A>'
+    """
+    for path, size in sizes.items():
+        pattern = re.compile(
+            rf'\d+(\s+<A\s+HREF="{re.escape(path)}")', flags=re.IGNORECASE
+        )
+        listing = pattern.sub(lambda match: f"{size}{match.group(1)}", listing)
+    return listing
+
+
+class ResponseReplayer:
+    """Serves recorded responses in place of requests.get, optionally at a larger scale.
+
+    Scaling repeats the data rows of every BLS file and rewrites the sizes in
+    the BLS listing to match. The DataUSA response is served unchanged, since
+    lambda_two joins on its Year column and duplicate years would grow the
+    join quadratically.
+
+    URLs that were requested but not recorded are kept in ``missed_urls``.
+
+    Args:
+        cassette_dir (Path): Directory written by a ResponseRecorder.
+        scale (int): Dataset multiplier applied to the recorded bodies.
+    """
+
+    def __init__(self, cassette_dir: Path, scale: int = 1):
+        if scale < 1:
+            raise ValueError("scale must be a positive integer")
+        self.cassette_dir = Path(cassette_dir)
+        manifest_path = self.cassette_dir / MANIFEST_FILE
+        if not manifest_path.is_file():
+            raise RecordingNotFoundError(f"No recording found at {manifest_path}")
+        self.manifest = json.loads(manifest_path.read_text())
+        validate_manifest(self.manifest)
+        self.scale = scale
+        self.bodies = self._load_bodies()
+        self.missed_urls = []
+
+    def _read_body(self, entry: dict) -> bytes:
+        return (self.cassette_dir / "responses" / entry["body_file"]).read_bytes()
+
+    def _load_bodies(self) -> dict[str, bytes]:
+        bodies = {}
+        sizes = {}
+        for url, entry in self.manifest.items():
+            body = self._read_body(entry)
+            if entry["kind"] == "bls_file":
+                body = scale_tabular_body(body, self.scale)
+                sizes["/" + urlparse(url).path.lstrip("/")] = len(body)
+            bodies[url] = body
+        for url, entry in self.manifest.items():
+            if entry["kind"] == "bls_listing" and self.scale != 1:
+                encoding = entry.get("encoding") or "utf-8"
+                listing = bodies[url].decode(encoding)
+                bodies[url] = rewrite_listing_sizes(listing, sizes).encode(encoding)
+        return bodies
+
+    def get(self, url, *args, **kwargs):
+        entry = self.manifest.get(url)
+        if entry is None:
+            self.missed_urls.append(url)
+            raise requests.exceptions.ConnectionError(
+                f"No recorded response for {url} (offline replay)"
+            )
+        response = requests.models.Response()
+        response.url = url
+        response.status_code = entry["status_code"]
+        response.encoding = entry.get("encoding")
+        if entry.get("content_type"):
+            response.headers["Content-Type"] = entry["content_type"]
+        response._content = self.bodies[url]
+        return response
@@ -0,0 +1,239 @@
+import io
+import json
+import re
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from urllib.parse import urlparse
+
+import requests
+
+from botocore.exceptions import ClientError
+
+from local_replay.__main__ import LOCAL_BUCKET, main
+from local_replay.local_aws import LocalListObjectsV2Paginator, LocalS3Client
+from local_replay.recording import (
+    IncompleteRecordingError,
+    ResponseRecorder,
+    ResponseReplayer,
+    validate_manifest,
+)
+
+CASSETTE_DIR = Path(__file__).parent / "fixtures" / "cassette"
+LISTING_URL = "https://download.bls.gov//pub/time.series/pr/"
+DATA_FILE_URL = "https://download.bls.gov//pub/time.series/pr/pr.data.0.Current"
+FIXTURE_DATA_ROWS = 4
+
+
+class LocalS3ClientTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.client = LocalS3Client(Path(self.tmp.name))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_put_head_get_delete_round_trip(self):
+        self.client.put_object(
+            Bucket="bucket",
+            Key="bls_data/pr.class",
+            Body=b"class_code\n",
+            Metadata={"file_size": "11"},
+        )
+        head = self.client.head_object(Bucket="bucket", Key="bls_data/pr.class")
+        self.assertEqual(head["Metadata"], {"file_size": "11"})
+        self.assertEqual(head["ContentLength"], 11)
+        body = self.client.get_object(Bucket="bucket", Key="bls_data/pr.class")
+        self.assertEqual(body["Body"].read(), b"class_code\n")
+
+        self.client.delete_object(Bucket="bucket", Key="bls_data/pr.class")
+        with self.assertRaises(ClientError):
+            self.client.head_object(Bucket="bucket", Key="bls_data/pr.class")
+        self.assertEqual(self.client._list_keys("bucket"), [])
+
+    def test_list_keys_filters_by_prefix_in_key_order(self):
+        for key in ["bls_data/b", "datausa/c", "bls_data/a"]:
+            self.client.put_object(Bucket="bucket", Key=key, Body="x")
+        keys = [obj["Key"] for obj in self.client._list_keys("bucket", "bls_data/")]
+        self.assertEqual(keys, ["bls_data/a", "bls_data/b"])
+
+    def test_paginator_splits_pages(self):
+        for key in ["a", "b", "c"]:
+            self.client.put_object(Bucket="bucket", Key=key, Body="x")
+        paginator = LocalListObjectsV2Paginator(self.client, page_size=2)
+        pages = list(paginator.paginate(Bucket="bucket"))
+        self.assertEqual([page["KeyCount"] for page in pages], [2, 1])
+        empty = list(paginator.paginate(Bucket="bucket", Prefix="missing/"))
+        self.assertNotIn("Contents", empty[0])
+
+
+class ResponseReplayerTest(unittest.TestCase):
+    def test_scale_repeats_bls_rows_and_rewrites_listing_sizes(self):
+        replayer = ResponseReplayer(CASSETTE_DIR, scale=3)
+        data = replayer.get(DATA_FILE_URL).content
+        self.assertEqual(len(data.splitlines()), 1 + FIXTURE_DATA_ROWS * 3)
+
+        listing = replayer.get(LISTING_URL).text
+        for url, body in replayer.bodies.items():
+            if replayer.manifest[url]["kind"] != "bls_file":
+                continue
+            path = "/" + urlparse(url).path.lstrip("/")
+            self.assertRegex(listing, rf'\s{len(body)} <A HREF="{re.escape(path)}"')
+
+    def test_api_response_is_not_scaled(self):
+        original = ResponseReplayer(CASSETTE_DIR)
+        scaled = ResponseReplayer(CASSETTE_DIR, scale=3)
+        for url, entry in original.manifest.items():
+            if entry["kind"] == "api":
+                self.assertEqual(scaled.get(url).json(), original.get(url).json())
+
+    def test_unrecorded_url_raises_connection_error(self):
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            ResponseReplayer(CASSETTE_DIR).get("https://example.com/")
+
+    def test_validate_manifest_rejects_incomplete_recording(self):
+        manifest = json.loads((CASSETTE_DIR / "manifest.json").read_text())
+        validate_manifest(manifest)
+        listing_only = {LISTING_URL: manifest[LISTING_URL]}
+        with self.assertRaises(IncompleteRecordingError):
+            validate_manifest(listing_only)
+
+
+class ResponseRecorderTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cassette_dir = Path(self.tmp.name) / "cassette"
+        shutil.copytree(CASSETTE_DIR, self.cassette_dir)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def snapshot(self):
+        return {
+            path.relative_to(self.cassette_dir): path.read_bytes()
+            for path in self.cassette_dir.rglob("*")
+            if path.is_file()
+        }
+
+    def test_failed_recording_leaves_existing_cassette_untouched(self):
+        def denied(url, *args, **kwargs):
+            response = requests.models.Response()
+            response.status_code = 403
+            response._content = b"<html>Access Denied</html>"
+            return response
+
+        before = self.snapshot()
+        recorder = ResponseRecorder(self.cassette_dir, get=denied)
+        recorder.get(LISTING_URL)
+        with self.assertRaises(IncompleteRecordingError):
+            recorder.save()
+        self.assertEqual(self.snapshot(), before)
+        self.assertEqual(
+            [path.name for path in self.cassette_dir.parent.iterdir()], ["cassette"]
+        )
+
+    def test_successful_recording_replaces_stale_bodies(self):
+        replayer = ResponseReplayer(CASSETTE_DIR)
+        stale_body = self.cassette_dir / "responses" / "stale_body"
+        stale_body.write_bytes(b"stale")
+        recorder = ResponseRecorder(self.cassette_dir, get=replayer.get)
+        for url in replayer.manifest:
+            recorder.get(url)
+        recorder.save()
+        self.assertFalse(stale_body.exists())
+        self.assertEqual(
+            ResponseReplayer(self.cassette_dir).manifest, replayer.manifest
+        )
+
+
+class ReplayEndToEndTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.bucket_dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_cli(self, *args):
+        with self.assertLogs(level="INFO") as logs:
+            main(
+                ["run", "--cassette", str(CASSETTE_DIR)]
+                + ["--bucket-dir", str(self.bucket_dir)]
+                + list(args)
+            )
+        return "\n".join(logs.output)
+
+    def test_both_handlers_replay_offline(self):
+        output = self.run_cli("--handler", "both", "--scale", "2")
+        bucket = self.bucket_dir / LOCAL_BUCKET
+        for key in [
+            "bls_data/pr.class",
+            "bls_data/pr.data.0.Current",
+            "datausa/datausa_population.json",
+        ]:
+            self.assertTrue((bucket / key).is_file(), key)
+        self.assertIn(
+            f"BLS DataFrame loaded with {FIXTURE_DATA_ROWS * 2} records", output
+        )
+        self.assertIn("Mean Population (2013-2018)", output)
+        self.assertNotIn("ERROR", output)
+
+    def test_lambda_two_is_reseeded_at_requested_scale(self):
+        self.run_cli("--handler", "one")
+        output = self.run_cli("--handler", "two", "--scale", "5")
+        self.assertIn(
+            f"BLS DataFrame loaded with {FIXTURE_DATA_ROWS * 5} records", output
+        )
+
+    def damaged_cassette(self):
+        cassette_dir = self.bucket_dir.parent / f"{self.bucket_dir.name}_cassette"
+        shutil.copytree(CASSETTE_DIR, cassette_dir)
+        self.addCleanup(shutil.rmtree, cassette_dir)
+        return cassette_dir
+
+    def assert_run_fails(self, cassette_dir):
+        stdout = io.StringIO()
+        with redirect_stdout(stdout), self.assertRaises(SystemExit) as exit_info:
+            with self.assertLogs(level="ERROR") as logs:
+                main(["run", "--cassette", str(cassette_dir)])
+        self.assertEqual(exit_info.exception.code, 1)
+        self.assertNotIn("_handler (scale=", stdout.getvalue())
+        return "\n".join(logs.output)
+
+    def test_unrecorded_url_fails_the_run(self):
+        cassette_dir = self.damaged_cassette()
+        manifest_path = cassette_dir / "manifest.json"
+        manifest = json.loads(manifest_path.read_text())
+        del manifest["https://download.bls.gov//pub/time.series/pr/pr.class"]
+        manifest_path.write_text(json.dumps(manifest))
+        output = self.assert_run_fails(cassette_dir)
+        self.assertIn("requested unrecorded URLs", output)
+
+    def test_handler_errors_fail_the_run(self):
+        cassette_dir = self.damaged_cassette()
+        manifest = json.loads((cassette_dir / "manifest.json").read_text())
+        listing_file = manifest[LISTING_URL]["body_file"]
+        (cassette_dir / "responses" / listing_file).write_bytes(
+            b"<html>Access Denied</html>"
+        )
+        output = self.assert_run_fails(cassette_dir)
+        self.assertIn("lambda_two_handler logged", output)
+
+    def test_missing_recording_exits_cleanly(self):
+        with self.assertRaises(SystemExit), self.assertLogs(level="ERROR") as logs:
+            main(["run", "--cassette", str(self.bucket_dir / "missing")])
+        self.assertIn("run `python -m local_replay record` first", logs.output[0])
+
+    def test_missing_body_file_is_not_reported_as_missing_recording(self):
+        cassette_dir = self.bucket_dir / "cassette"
+        shutil.copytree(CASSETTE_DIR, cassette_dir)
+        for body_file in (cassette_dir / "responses").iterdir():
+            body_file.unlink()
+        with self.assertRaises(FileNotFoundError):
+            main(["run", "--cassette", str(cassette_dir)])
+
+
+if __name__ == "__main__":
+    unittest.main()